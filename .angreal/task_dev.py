@@ -1,52 +1,281 @@
 import angreal
+import json
+import os
+import shlex
+import stat
 import subprocess
+import sys
 from pathlib import Path
-import shutil
 
 root = angreal.get_root()
+# get_root() is the .angreal directory; the project itself is its parent
+PROJECT_ROOT = Path(root).parent
 DEV_DIR = Path(root) / "dev"
 
-# Ensure dev directory exists
-DEV_DIR.mkdir(exist_ok=True)
+# DEV_DIR is created on first write rather than on every import
+_dev_dir_ready = False
+
+def _ensure_dev_dir():
+    """Create DEV_DIR if this process has not already done so."""
+    global _dev_dir_ready
+    if not _dev_dir_ready:
+        DEV_DIR.mkdir(exist_ok=True)
+        _dev_dir_ready = True
+
+# Large directories that clean() renames aside and deletes in the background
+BACKGROUND_REMOVALS = {"node_modules", "dist", ".astro"}
+
+PACKAGE_JSON = PROJECT_ROOT / "package.json"
+SCRIPTS_CACHE = DEV_DIR / ".scripts.cache.json"
+INSTALL_STAMP = DEV_DIR / ".install.stamp"
+
+def _write_dev_file(path, text):
+    """Atomically write a cache/stamp file under DEV_DIR, best-effort.
+
+    These files are only optimizations, so a failed write never stops a
+    command; a unique temp file keeps concurrent commands from racing.
+    """
+    try:
+        import tempfile
+
+        _ensure_dev_dir()
+        fd, tmp = tempfile.mkstemp(dir=DEV_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except OSError:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        pass
+
+def _load_scripts():
+    """Return the package.json scripts, cached on disk by package.json mtime."""
+    mtime = os.stat(PACKAGE_JSON).st_mtime_ns
+    try:
+        with open(SCRIPTS_CACHE) as f:
+            cache = json.load(f)
+        if cache["mtime"] == mtime:
+            return cache["scripts"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    with open(PACKAGE_JSON) as f:
+        scripts = json.load(f)["scripts"]
+    _write_dev_file(SCRIPTS_CACHE, json.dumps({"mtime": mtime, "scripts": scripts}))
+    return scripts
+
+# Characters that need a real shell to interpret (operators, expansions, globs)
+SHELL_METACHARACTERS = set("|&;<>()$`\\*?[]{}~#!\n")
+
+def _script_args(name):
+    """Return the argv to run a package.json script.
+
+    Plain commands are exec'd directly. Scripts that need a shell (operators,
+    expansions, globs, leading VAR=value assignments) or that have pre/post
+    hooks fall back to `npm run`, which also provides the npm_* environment.
+    """
+    scripts = _load_scripts()
+    command = scripts[name]
+    args = shlex.split(command)
+    if (
+        SHELL_METACHARACTERS & set(command)
+        or not args
+        or "=" in args[0]
+        or f"pre{name}" in scripts
+        or f"post{name}" in scripts
+    ):
+        return ["npm", "run", name]
+    return args
+
+def _start_script(name):
+    """Start a package.json script, skipping the npm and shell wrappers when possible."""
+    args = _script_args(name)
+    env = dict(os.environ)
+    # `npm run` puts local binaries on PATH; do the same here.
+    env["PATH"] = os.pathsep.join([str(PROJECT_ROOT / "node_modules" / ".bin"), env.get("PATH", "")])
+    return subprocess.Popen(args, cwd=PROJECT_ROOT, env=env)
+
+def _run_scripts(*names):
+    """Run package.json scripts concurrently and wait for all of them."""
+    procs = []
+    try:
+        for name in names:
+            procs.append(_start_script(name))
+        for proc in procs:
+            proc.wait()
+    except BaseException:
+        # Like subprocess.run: don't leave children running if we are
+        # interrupted (Ctrl-C) or a sibling could not be started.
+        for proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+        for proc in procs:
+            proc.wait()
+        raise
+    for proc in procs:
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args)
+
+def _run_script(name):
+    """Run a single package.json script."""
+    _run_scripts(name)
+
+def _dependency_hash():
+    """Hash package.json and package-lock.json, or None if either is missing."""
+    import hashlib
+
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        for name in ("package.json", "package-lock.json"):
+            with open(PROJECT_ROOT / name, "rb") as f:
+                h.update(f.read())
+    except FileNotFoundError:
+        return None
+    return h.hexdigest()
 
 @angreal.command(name="setup", about="Install dependencies")
 def setup():
-    """Install all project dependencies."""
-    subprocess.run(["npm", "install"], cwd=root, check=True)
+    """Install all project dependencies, unless package.json and the lockfile are unchanged."""
+    current = _dependency_hash()
+    try:
+        installed = INSTALL_STAMP.read_text()
+    except OSError:
+        installed = None
+    if current is not None and installed == current and (PROJECT_ROOT / "node_modules").is_dir():
+        print("Dependencies up to date.")
+        return
+    subprocess.run(["npm", "install"], cwd=PROJECT_ROOT, check=True)
+    # npm install may have created or rewritten the lockfile, so hash afterwards.
+    current = _dependency_hash()
+    if current is not None:
+        _write_dev_file(INSTALL_STAMP, current)
     print("Dependencies installed.")
 
 @angreal.command(name="dev", about="Start the development server")
 def dev():
     """Start the development server."""
-    subprocess.run(["npm", "run", "dev"], cwd=root, check=True)
+    _run_script("dev")
 
 @angreal.command(name="build", about="Build the project for production")
 def build():
     """Build the project for production."""
-    subprocess.run(["npm", "run", "build"], cwd=root, check=True)
+    _run_script("build")
     print("Build complete! Output is in the 'dist' directory.")
 
 @angreal.command(name="lint", about="Run the linter")
 def lint():
     """Run the linter on the codebase."""
-    subprocess.run(["npm", "run", "lint"], cwd=root, check=True)
+    _run_script("lint")
+
+@angreal.command(name="build_release", about="Build and lint in parallel for CI")
+def build_release():
+    """Build the project and run the linter concurrently.
+
+    The individual build and lint commands remain for development use.
+    """
+    _run_scripts("build", "lint")
+    print("Build complete! Output is in the 'dist' directory.")
+
+def _fast_rmtree(path):
+    """Remove a directory tree, walking it with os.scandir.
+
+    Entry types come from the readdir buffer, so files and symlinks are
+    unlinked without the extra lstat calls shutil.rmtree makes.
+    """
+    stack = [os.fspath(path)]
+    dirs = []
+    while stack:
+        current = stack.pop()
+        dirs.append(current)
+        with os.scandir(current) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    os.unlink(entry.path)
+    # Parents are visited before their children, so remove in reverse.
+    for d in reversed(dirs):
+        os.rmdir(d)
+
+def _stage_removal(target):
+    """Rename a directory aside and delete it in a detached process.
+
+    Returns False if the rename is not possible, so the caller can fall
+    back to removing the directory in place.
+    """
+    import uuid
+
+    # Stage next to the target rather than under DEV_DIR, which clean()
+    # removes concurrently.
+    staged = target.parent / f".trash-{uuid.uuid4().hex}"
+    try:
+        target.rename(staged)
+    except OSError:
+        # e.g. EBUSY for a bind- or volume-mounted node_modules
+        return False
+    try:
+        subprocess.Popen(
+            ["rm", "-rf", str(staged)],
+            start_new_session=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        # No usable `rm` (e.g. on Windows); the target is already renamed,
+        # so remove the staged tree in place.
+        _fast_rmtree(staged)
+    return True
+
+def _rm(target):
+    """Remove a single clean target, whether file or directory.
+
+    Returns a status line for clean() to report, or None if the target
+    did not exist.
+    """
+    # One lstat answers both "does it exist" and "is it a directory".
+    try:
+        st = os.lstat(target)
+    except FileNotFoundError:
+        return None
+    if stat.S_ISDIR(st.st_mode):
+        if target.name not in BACKGROUND_REMOVALS or not _stage_removal(target):
+            _fast_rmtree(target)
+        return f"Removed directory: {target}"
+    os.unlink(target)
+    return f"Removed file: {target}"
 
 @angreal.command(name="clean", about="Clean build caches and node_modules")
 def clean():
     """Remove build artifacts and node_modules."""
+    global _dev_dir_ready
+    from concurrent.futures import ThreadPoolExecutor
+
     targets = [
-        Path(root) / "dist",
-        Path(root) / ".astro",
-        Path(root) / "node_modules",
+        PROJECT_ROOT / "dist",
+        PROJECT_ROOT / ".astro",
+        PROJECT_ROOT / "node_modules",
         DEV_DIR,
     ]
-    for target in targets:
-        if target.exists():
-            if target.is_dir():
-                shutil.rmtree(target)
-                print(f"Removed directory: {target}")
-            else:
-                target.unlink()
-                print(f"Removed file: {target}")
-    DEV_DIR.mkdir(exist_ok=True)
-    print("Clean complete!")
\ No newline at end of file
+    # Targets are disjoint subtrees, so they can be removed concurrently.
+    with ThreadPoolExecutor(max_workers=len(targets)) as ex:
+        futures = [ex.submit(_rm, target) for target in targets]
+    # DEV_DIR was just removed, so it has to be recreated
+    _dev_dir_ready = False
+    _ensure_dev_dir()
+    # Report everything in one write, in target order, once all workers finish.
+    # Removals that succeeded are still reported if another target failed.
+    lines = []
+    error = None
+    for future in futures:
+        exc = future.exception()
+        if exc is not None:
+            error = error or exc
+        elif future.result():
+            lines.append(future.result())
+    if error is None:
+        lines.append("Clean complete!")
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+    if error is not None:
+        raise error
\ No newline at end of file
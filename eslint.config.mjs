@@ -73,6 +73,7 @@ export default defineConfig([
 			".github/",
 			".netlify/",
 			".changeset/",
+			".trash-*/", // staged by `angreal clean` while a background rm finishes
 		],
 	},
 ]);